@@ -15,6 +15,7 @@ from config import config
 from app.models.base import db
 from app.models import User, UserRole
 from app.api import auth_bp, books_bp, admin_bp
+from app.json_provider import OrjsonProvider
 
 
 def create_app(config_name='default'):
@@ -29,6 +30,7 @@ def create_app(config_name='default'):
     """
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = OrjsonProvider(app)
     
     # Initialize extensions
     db.init_app(app)
@@ -37,8 +37,12 @@ def get_books(limit, offset, filters, current_user):
       - in: query
         name: offset
         type: integer
-        description: Number of books to skip
+        description: Number of books to skip (ignored when after_id is given)
         default: 0
+      - in: query
+        name: after_id
+        type: integer
+        description: Keyset cursor - return books with ID greater than this, ordered by ID
       - in: query
         name: title
         type: string
@@ -110,9 +114,13 @@ def get_books(limit, offset, filters, current_user):
     
     # Get total count for pagination info
     total = query.count()
-    
+
     # Apply pagination and get results
-    books = query.order_by(Book.created_at.desc()).offset(offset).limit(limit).all()
+    if 'after_id' in filters:
+        # Keyset pagination walks the primary key index instead of skipping rows
+        books = query.filter(Book.id > filters['after_id']).order_by(Book.id).limit(limit).all()
+    else:
+        books = query.order_by(Book.created_at.desc()).offset(offset).limit(limit).all()
     
     return jsonify({
         'books': [book.to_dict() for book in books],
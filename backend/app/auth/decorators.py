@@ -132,7 +132,7 @@ def validate_pagination_and_filters():
     """
     Combined decorator to validate pagination and filter parameters from query string.
     
-    Validates 'limit', 'offset' parameters and extracts filter parameters.
+    Validates 'limit', 'offset' and 'after_id' parameters and extracts filter parameters.
     
     Returns:
         Decorator function that provides pagination and filter parameters
@@ -175,7 +175,17 @@ def validate_pagination_and_filters():
                         filters['publish_year'] = int(request.args['publish_year'])
                     except ValueError:
                         return jsonify({'error': 'Invalid publish_year parameter'}), 400
-                
+
+                # Keyset pagination cursor: return only books with id > after_id
+                if 'after_id' in request.args:
+                    try:
+                        filters['after_id'] = int(request.args['after_id'])
+                    except ValueError:
+                        return jsonify({'error': 'Invalid after_id parameter'}), 400
+
+                    if filters['after_id'] < 0:
+                        return jsonify({'error': 'after_id must be non-negative'}), 400
+
                 return f(limit, offset, filters, *args, **kwargs)
             except ValueError:
                 return jsonify({'error': 'Invalid pagination parameters'}), 400
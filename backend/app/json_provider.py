@@ -0,0 +1,85 @@
+"""
+JSON provider for the BookCrossing application.
+
+This module contains an orjson-backed replacement for Flask's default
+JSON provider, used for both request parsing and response serialization.
+"""
+
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def _default(obj):
+    """
+    Serialize objects that orjson does not support natively.
+
+    Args:
+        obj: Object that could not be serialized
+
+    Returns:
+        str: String representation of the object
+
+    Raises:
+        TypeError: If the object type is not supported
+    """
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider that uses orjson for encoding and decoding.
+
+    orjson natively handles datetime, UUID, Enum and dataclass values, and
+    is several times faster than the standard library json module.
+    """
+
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as a JSON string.
+
+        Args:
+            obj: Data to serialize
+            **kwargs: Ignored, kept for compatibility with JSONProvider
+
+        Returns:
+            str: JSON string
+        """
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize data from a JSON string or bytes.
+
+        Args:
+            s: JSON text or bytes
+            **kwargs: Ignored, kept for compatibility with JSONProvider
+
+        Returns:
+            Deserialized Python object
+        """
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize data directly to a JSON response.
+
+        Skips the intermediate str decode performed by the base class.
+
+        Returns:
+            Response: Response object with application/json mimetype
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self.option),
+            mimetype='application/json'
+        )
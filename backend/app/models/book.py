@@ -27,7 +27,11 @@ class Book(db.Model):
     """
     
     __tablename__ = 'books'
-    
+    __table_args__ = (
+        # Serves the available_only filter (taken_by IS NULL) in id order
+        db.Index('ix_book_taken_available', 'taken_by', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(255), nullable=False, index=True)
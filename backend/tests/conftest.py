@@ -11,6 +11,9 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from testcontainers.postgres import PostgresContainer
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+from sqlalchemy import insert
 from app import create_app
 from app.models.base import db
 from app.models import User, Book, UserRole
@@ -44,6 +47,8 @@ def app_config(postgres_container):
         'SQLALCHEMY_DATABASE_URI': postgres_container.get_connection_url(),
         'SQLALCHEMY_TRACK_MODIFICATIONS': False,
         'JWT_ACCESS_TOKEN_EXPIRES': False,  # Tokens don't expire in tests
+        'JWT_ALGORITHM': 'HS256',  # Cheap symmetric signing for tests
+        'JWT_SECRET_KEY': 'test',
         'SECRET_KEY': 'test-secret-key'
     }
 
@@ -79,7 +84,8 @@ def client(app):
     Returns:
         FlaskClient: Test client for the application
     """
-    return app.test_client()
+    # Authentication is header-based (JWT), so the cookie jar is never needed
+    return app.test_client(use_cookies=False)
 
 
 @pytest.fixture(scope='function')
@@ -145,27 +151,38 @@ def sample_admin(db_session):
     return admin
 
 
+@pytest.fixture(scope='session')
+def book_fields():
+    """
+    Provide the sample book field values, shared by the whole test session.
+    
+    Returns:
+        dict: Book constructor arguments except owner_id
+    """
+    return {
+        'title': 'Test Book',
+        'author': 'Test Author',
+        'publish_year': 2023,
+        'genre': 'Fiction',
+        'meeting_address': '123 Test St',
+        'description': 'A test book'
+    }
+
+
 @pytest.fixture
-def sample_book(db_session, sample_user):
+def sample_book(db_session, sample_user, book_fields):
     """
     Create a sample book for testing.
     
     Args:
         db_session: Database session fixture
         sample_user: Sample user fixture
+        book_fields: Sample book field values fixture
         
     Returns:
         Book: Sample book instance
     """
-    book = Book(
-        owner_id=sample_user.id,
-        title='Test Book',
-        author='Test Author',
-        publish_year=2023,
-        genre='Fiction',
-        meeting_address='123 Test St',
-        description='A test book'
-    )
+    book = Book(owner_id=sample_user.id, **book_fields)
     db_session.add(book)
     db_session.commit()
     return book
@@ -213,6 +230,70 @@ def admin_headers(client, sample_admin):
     return {'Authorization': f'Bearer {token}'}
 
 
+@pytest.fixture(scope='session')
+def make_auth_headers(app):
+    """
+    Create a factory for authorization headers without logging in.
+    
+    Tokens are signed directly with the test JWT secret and cached per
+    user ID, so no request to /api/auth or password check is needed.
+    
+    Args:
+        app: Flask application fixture
+        
+    Returns:
+        callable: Function taking a user ID and returning a headers dictionary
+    """
+    tokens = {}
+    
+    def _make_auth_headers(user_id):
+        if user_id not in tokens:
+            with app.app_context():
+                tokens[user_id] = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {tokens[user_id]}'}
+    
+    return _make_auth_headers
+
+
+@pytest.fixture(scope='session')
+def cached_password_hash():
+    """
+    Hash a throwaway password once for users that never log in by password.
+    
+    Returns:
+        str: Werkzeug password hash
+    """
+    return generate_password_hash('password')
+
+
+@pytest.fixture
+def make_logged_in_user(db_session, make_auth_headers, cached_password_hash):
+    """
+    Create a factory that inserts a user and returns its authorization headers.
+    
+    The user row is written with a Core INSERT ... RETURNING and a cached
+    password hash, and the JWT is signed directly, so neither password
+    hashing nor an HTTP login is performed.
+    
+    Args:
+        db_session: Database session fixture
+        make_auth_headers: Authorization headers factory fixture
+        cached_password_hash: Precomputed password hash fixture
+        
+    Returns:
+        callable: Function taking a username and returning (user_id, headers)
+    """
+    def _make_logged_in_user(username, role=UserRole.USER):
+        user_id = db_session.execute(
+            insert(User)
+            .values(username=username, hashed_password=cached_password_hash, role=role)
+            .returning(User.id)
+        ).scalar_one()
+        return user_id, make_auth_headers(user_id)
+    
+    return _make_logged_in_user
+
+
 @pytest.fixture
 def multiple_books(db_session, sample_user):
     """
@@ -225,8 +306,6 @@ def multiple_books(db_session, sample_user):
     Returns:
         list: List of book instances
     """
-    books = []
-    
     # Create books with different genres and years
     book_data = [
         {'title': 'Fiction Book 1', 'author': 'Author A', 'genre': 'Fiction', 'year': 2020},
@@ -236,18 +315,20 @@ def multiple_books(db_session, sample_user):
         {'title': 'Mystery Book', 'author': 'Author E', 'genre': 'Mystery', 'year': 2023}
     ]
     
-    for data in book_data:
-        book = Book(
-            owner_id=sample_user.id,
-            title=data['title'],
-            author=data['author'],
-            publish_year=data['year'],
-            genre=data['genre'],
-            meeting_address='123 Test St',
-            description=f"Description for {data['title']}"
-        )
-        db_session.add(book)
-        books.append(book)
-    
+    # Insert all rows in one executemany instead of a unit-of-work flush per book
+    rows = [
+        {
+            'owner_id': sample_user.id,
+            'title': data['title'],
+            'author': data['author'],
+            'publish_year': data['year'],
+            'genre': data['genre'],
+            'meeting_address': '123 Test St',
+            'description': f"Description for {data['title']}"
+        }
+        for data in book_data
+    ]
+    db_session.bulk_insert_mappings(Book, rows)
     db_session.commit()
-    return books
\ No newline at end of file
+
+    return Book.query.filter_by(owner_id=sample_user.id).order_by(Book.id).all()
\ No newline at end of file
@@ -41,7 +41,8 @@ class TestBookCreation:
         assert data['book']['is_available'] is True
         
         # Verify book was created in database
-        book = Book.query.filter_by(title='Test Book').first()
+        book_id = data['book']['id']
+        book = db_session.get(Book, book_id)
         assert book is not None
         assert book.author == 'Test Author'
     
@@ -156,28 +157,58 @@ class TestBookCreation:
 class TestBookRetrieval:
     """Test cases for book retrieval endpoints."""
     
-    def test_get_all_books(self, client, multiple_books):
+    def test_get_books_combined(self, client, multiple_books, sample_user, db_session):
         """
-        Test retrieving all books with pagination.
+        Test listing, keyset pagination and filters on one fixture setup.
+        
+        The unfiltered list is fetched once and checked against the fixture
+        data; each filter is then requested to verify it is applied in SQL.
         
         Args:
             client: Test client fixture
             multiple_books: Multiple books fixture
+            sample_user: Sample user fixture
+            db_session: Database session fixture
         """
-        response = client.get('/api/books')
+        response = client.get('/api/books?limit=100')
         
         assert response.status_code == 200
         data = response.get_json()
-        assert 'books' in data
-        assert 'total' in data
-        assert 'limit' in data
-        assert 'offset' in data
-        assert len(data['books']) <= 10  # Default limit
         assert data['total'] == 5  # From multiple_books fixture
+        books = data['books']
+        assert {book['id'] for book in books} == {book.id for book in multiple_books}
+        
+        # Keyset pagination returns the next books by ID
+        after_id = multiple_books[0].id
+        data = client.get(f'/api/books?limit=2&after_id={after_id}').get_json()
+        assert [book['id'] for book in data['books']] == [
+            book.id for book in multiple_books[1:3]
+        ]
+        
+        # Title filter matches the books whose title contains "Fiction"
+        expected = {book['id'] for book in books if 'Fiction' in book['title']}
+        data = client.get('/api/books?title=Fiction').get_json()
+        assert data['total'] == len(expected) == 2
+        assert {book['id'] for book in data['books']} == expected
+        
+        # Genre filter matches the Fiction genre books
+        expected = {book['id'] for book in books if book['genre'] == 'Fiction'}
+        data = client.get('/api/books?genre=Fiction').get_json()
+        assert {book['id'] for book in data['books']} == expected
+        
+        # Mark one book as taken; it must be excluded in SQL
+        multiple_books[0].taken_by = sample_user.id
+        db_session.commit()
+        
+        data = client.get('/api/books?available_only=true').get_json()
+        assert data['total'] == 4
+        assert {book['id'] for book in data['books']} == {book.id for book in multiple_books[1:]}
+        for book in data['books']:
+            assert book['is_available'] is True
     
-    def test_get_books_with_pagination(self, client, multiple_books):
+    def test_get_books_offset_pagination(self, client, multiple_books):
         """
-        Test book retrieval with custom pagination parameters.
+        Test the default offset pagination (no after_id cursor).
         
         Args:
             client: Test client fixture
@@ -188,61 +219,43 @@ class TestBookRetrieval:
         assert response.status_code == 200
         data = response.get_json()
         assert len(data['books']) == 2
-        assert data['limit'] == 2
-        assert data['offset'] == 1
+        assert data['total'] == 5
+        
+        # The last page holds the remaining book, past the end there are none
+        data = client.get('/api/books?limit=2&offset=4').get_json()
+        assert len(data['books']) == 1
+        data = client.get('/api/books?limit=2&offset=5').get_json()
+        assert data['books'] == []
+        assert data['total'] == 5
     
-    def test_get_books_with_title_filter(self, client, multiple_books):
+    def test_get_books_keyset_pagination_last_page(self, client, multiple_books):
         """
-        Test book retrieval with title filter.
+        Test that keyset pagination stops after the last book.
         
         Args:
             client: Test client fixture
             multiple_books: Multiple books fixture
         """
-        response = client.get('/api/books?title=Fiction')
+        after_id = multiple_books[-2].id
+        response = client.get(f'/api/books?limit=2&after_id={after_id}')
         
         assert response.status_code == 200
         data = response.get_json()
-        # Should return books with "Fiction" in title
-        fiction_books = [book for book in data['books'] if 'Fiction' in book['title']]
-        assert len(fiction_books) > 0
+        assert [book['id'] for book in data['books']] == [multiple_books[-1].id]
     
-    def test_get_books_with_genre_filter(self, client, multiple_books):
+    def test_get_books_invalid_after_id(self, client, multiple_books):
         """
-        Test book retrieval with genre filter.
+        Test book retrieval with a non-integer keyset cursor.
         
         Args:
             client: Test client fixture
             multiple_books: Multiple books fixture
         """
-        response = client.get('/api/books?genre=Fiction')
-        
-        assert response.status_code == 200
-        data = response.get_json()
-        # All returned books should be Fiction genre
-        for book in data['books']:
-            assert book['genre'] == 'Fiction'
-    
-    def test_get_books_available_only_filter(self, client, multiple_books, sample_user):
-        """
-        Test book retrieval with available_only filter.
+        response = client.get('/api/books?after_id=abc')
         
-        Args:
-            client: Test client fixture
-            multiple_books: Multiple books fixture
-            sample_user: Sample user fixture
-        """
-        # Mark one book as taken
-        book = multiple_books[0]
-        book.taken_by = sample_user.id
-        
-        response = client.get('/api/books?available_only=true')
-        
-        assert response.status_code == 200
+        assert response.status_code == 400
         data = response.get_json()
-        # All returned books should be available
-        for book in data['books']:
-            assert book['is_available'] is True
+        assert 'Invalid after_id parameter' in data['error']
     
     def test_get_books_invalid_pagination(self, client):
         """
@@ -334,7 +347,7 @@ class TestBookUpdate:
         assert data['book']['title'] == 'Updated Test Book'
         
         # Verify update in database
-        db_session.refresh(sample_book)
+        db_session.expire(sample_book, ['title'])
         assert sample_book.title == 'Updated Test Book'
     
     def test_update_nonexistent_book(self, client, auth_headers):
@@ -357,26 +370,17 @@ class TestBookUpdate:
         
         assert response.status_code == 404
     
-    def test_update_book_without_ownership(self, client, sample_book, db_session):
+    def test_update_book_without_ownership(self, client, sample_book, make_logged_in_user):
         """
         Test updating a book not owned by the user.
         
         Args:
             client: Test client fixture
             sample_book: Sample book fixture
-            db_session: Database session fixture
+            make_logged_in_user: Logged-in user factory fixture
         """
-        # Create another user
-        other_user = User('otheruser', 'otherpassword')
-        db_session.add(other_user)
-        db_session.commit()
-        
-        # Login as other user
-        login_response = client.post('/api/auth', json={
-            'username': 'otheruser',
-            'password': 'otherpassword'
-        })
-        other_headers = {'Authorization': f'Bearer {login_response.get_json()["access_token"]}'}
+        # Create and authenticate another user
+        _, other_headers = make_logged_in_user('otheruser')
         
         update_data = {
             'title': 'Unauthorized Update',
@@ -459,26 +463,17 @@ class TestBookDeletion:
         
         assert response.status_code == 404
     
-    def test_delete_book_without_ownership(self, client, sample_book, db_session):
+    def test_delete_book_without_ownership(self, client, sample_book, make_logged_in_user):
         """
         Test deleting a book not owned by the user.
         
         Args:
             client: Test client fixture
             sample_book: Sample book fixture
-            db_session: Database session fixture
+            make_logged_in_user: Logged-in user factory fixture
         """
-        # Create another user
-        other_user = User('otheruser', 'otherpassword')
-        db_session.add(other_user)
-        db_session.commit()
-        
-        # Login as other user
-        login_response = client.post('/api/auth', json={
-            'username': 'otheruser',
-            'password': 'otherpassword'
-        })
-        other_headers = {'Authorization': f'Bearer {login_response.get_json()["access_token"]}'}
+        # Create and authenticate another user
+        _, other_headers = make_logged_in_user('otheruser')
         
         response = client.delete(f'/api/books/{sample_book.id}', headers=other_headers)
         
@@ -488,7 +483,7 @@ class TestBookDeletion:
 class TestBookTaking:
     """Test cases for book taking endpoint."""
     
-    def test_successful_book_taking(self, client, sample_book, db_session):
+    def test_successful_book_taking(self, client, sample_book, db_session, make_logged_in_user):
         """
         Test successfully taking an available book.
         
@@ -496,18 +491,10 @@ class TestBookTaking:
             client: Test client fixture
             sample_book: Sample book fixture
             db_session: Database session fixture
+            make_logged_in_user: Logged-in user factory fixture
         """
-        # Create another user to take the book
-        taker = User('booktaker', 'takerpassword')
-        db_session.add(taker)
-        db_session.commit()
-        
-        # Login as taker
-        login_response = client.post('/api/auth', json={
-            'username': 'booktaker',
-            'password': 'takerpassword'
-        })
-        taker_headers = {'Authorization': f'Bearer {login_response.get_json()["access_token"]}'}
+        # Create and authenticate another user to take the book
+        taker_id, taker_headers = make_logged_in_user('booktaker')
         
         response = client.post(f'/api/books/{sample_book.id}/take', headers=taker_headers)
         
@@ -517,8 +504,8 @@ class TestBookTaking:
         assert data['book']['is_available'] is False
         
         # Verify in database
-        db_session.refresh(sample_book)
-        assert sample_book.taken_by == taker.id
+        db_session.expire(sample_book, ['taken_by'])
+        assert sample_book.taken_by == taker_id
     
     def test_take_own_book(self, client, auth_headers, sample_book):
         """
@@ -535,7 +522,7 @@ class TestBookTaking:
         data = response.get_json()
         assert 'Cannot take this book' in data['error']
     
-    def test_take_already_taken_book(self, client, sample_book, db_session):
+    def test_take_already_taken_book(self, client, sample_book, db_session, make_logged_in_user):
         """
         Test attempting to take an already taken book.
         
@@ -543,27 +530,17 @@ class TestBookTaking:
             client: Test client fixture
             sample_book: Sample book fixture
             db_session: Database session fixture
+            make_logged_in_user: Logged-in user factory fixture
         """
         # Create first taker
-        first_taker = User('firsttaker', 'password1')
-        db_session.add(first_taker)
-        db_session.commit()
+        first_taker_id, _ = make_logged_in_user('firsttaker')
         
         # Mark book as taken
-        sample_book.taken_by = first_taker.id
-        db_session.commit()
-        
-        # Create second user trying to take the book
-        second_taker = User('secondtaker', 'password2')
-        db_session.add(second_taker)
+        sample_book.taken_by = first_taker_id
         db_session.commit()
         
-        # Login as second taker
-        login_response = client.post('/api/auth', json={
-            'username': 'secondtaker',
-            'password': 'password2'
-        })
-        second_headers = {'Authorization': f'Bearer {login_response.get_json()["access_token"]}'}
+        # Create and authenticate second user trying to take the book
+        _, second_headers = make_logged_in_user('secondtaker')
         
         response = client.post(f'/api/books/{sample_book.id}/take', headers=second_headers)
         
@@ -1,15 +1,43 @@
 """
 Модуль для создания и настройки Flask-приложения сервиса бронирования мест
 """
+import os
+import secrets
 from flask import Flask
-from src.app.user_funcs import register_user, get_current_user_info
+from src.app.user_funcs import register_user, get_current_user_info, login
 from flasgger import Swagger
+from src.database import enable_raiseload
+from src.json_provider import OrjsonProvider
 from src.app.admin_funcs import list_all_users_admin, delete_user_admin
 from src.app.booking_funcs import (create_booking, list_my_bookings,
                                    cancel_booking, move_booking)
 from src.app.place_funcs import list_places, create_place, delete_place
 
 
+# Таблица маршрутов API: (путь, обработчик, HTTP-методы)
+_ROUTES = (
+    ('/api/register', register_user, ['POST']),
+    ('/api/login', login, ['POST']),
+    ('/api/users/me', get_current_user_info, ['GET']),
+    ('/api/admin/users', list_all_users_admin, ['GET']),
+    ('/api/admin/users/<int:user_id>', delete_user_admin, ['DELETE']),
+    ('/api/bookings', create_booking, ['POST']),
+    ('/api/bookings', list_my_bookings, ['GET']),
+    ('/api/bookings/<int:booking_id>/cancel', cancel_booking, ['POST']),
+    ('/api/bookings/<int:booking_id>/move', move_booking, ['POST']),
+    ('/api/places', list_places, ['GET']),
+    ('/api/places', create_place, ['POST']),
+    ('/api/admin/places/<int:place_id>', delete_place, ['DELETE']),
+)
+
+
+def _env_flag(name, default=''):
+    """
+    Читает булев флаг из переменной окружения ("1", "true", "yes", "on").
+    """
+    return os.environ.get(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 def create_app():
     """
     Создает и конфигурирует экземпляр Flask-приложения.
@@ -17,6 +45,16 @@ def create_app():
     Настраивает Swagger, привязывает URL-маршруты и возвращает готовое приложение.
     """
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    # Ключ для подписи сессионных токенов. Без SECRET_KEY генерируется случайный ключ
+    # на процесс: токены не переживают перезапуск, но и подделать их нельзя
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+    # Запрет ленивой подгрузки связей, чтобы ловить N+1. app.config['DEBUG'] здесь не подходит:
+    # app.run(debug=True) выставляет его позже. Поэтому флаг берётся из окружения,
+    # по умолчанию включён вместе с FLASK_DEBUG
+    app.config['SQLALCHEMY_RAISELOAD'] = _env_flag('SQLALCHEMY_RAISELOAD', os.environ.get('FLASK_DEBUG', ''))
+    if app.config['SQLALCHEMY_RAISELOAD']:
+        enable_raiseload()
     app.config['SWAGGER'] = {
         'title': 'CuWorking API',
         'openapi': '3.0.2'
@@ -30,6 +68,10 @@ def create_app():
         },
         "paths": {},
         "components": {
+            "securitySchemes": {
+                "basicAuth": {"type": "http", "scheme": "basic"},
+                "bearerAuth": {"type": "http", "scheme": "bearer"}
+            },
             "schemas": {
                 "Place": {
                     "type": "object",
@@ -164,17 +206,8 @@ def create_app():
     }
 
     # Создаем все пути
-    app.add_url_rule('/api/register', view_func=register_user, methods=['POST'])
-    app.add_url_rule('/api/users/me', view_func=get_current_user_info, methods=['GET'])
-    app.add_url_rule('/api/admin/users', view_func=list_all_users_admin, methods=['GET'])
-    app.add_url_rule('/api/admin/users/<int:user_id>', view_func=delete_user_admin, methods=['DELETE'])
-    app.add_url_rule('/api/bookings', view_func=create_booking, methods=['POST'])
-    app.add_url_rule('/api/bookings', view_func=list_my_bookings, methods=['GET'])
-    app.add_url_rule('/api/bookings/<int:booking_id>/cancel', view_func=cancel_booking, methods=['POST'])
-    app.add_url_rule('/api/bookings/<int:booking_id>/move', view_func=move_booking, methods=['POST'])
-    app.add_url_rule('/api/places', view_func=list_places, methods=['GET'])
-    app.add_url_rule('/api/places', view_func=create_place, methods=['POST'])
-    app.add_url_rule('/api/admin/places/<int:place_id>', view_func=delete_place, methods=['DELETE'])
+    for path, view_func, methods in _ROUTES:
+        app.add_url_rule(path, view_func=view_func, methods=methods)
 
     @app.route('/')
     def index():
@@ -2,9 +2,10 @@
 Модуль с методами для администратора
 """
 from flask import jsonify
-from src.database import get_db
+from src.database import session_scope
 from src.models.user import User
-from src.auth import admin_required
+from src.auth import admin_required, invalidate_user_cache
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -34,25 +35,27 @@ def list_all_users_admin():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()     # создали генератор, который управляет сессией
-    db = next(db_generator)     # получили саму сессию
-    try:
-        users = db.query(User).order_by(User.id).all()
-        users_list = []
-        for user in users:
-            users_list.append({
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "is_admin": user.is_admin
-            })
-        return jsonify(users_list), 200
-    except SQLAlchemyError as e:
-        return jsonify({"error": "Database error", "message": str(e)}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
-    finally:
-        db_generator.close()
+    with session_scope() as db:
+        try:
+            # Берём только нужные колонки: строки вместо ORM-объектов, загрузка пачками
+            users = db.execute(
+                select(User.id, User.username, User.email, User.is_admin)
+                .order_by(User.id)
+                .execution_options(yield_per=500)
+            )
+            users_list = []
+            for user in users:
+                users_list.append({
+                    "id": user.id,
+                    "username": user.username,
+                    "email": user.email,
+                    "is_admin": user.is_admin
+                })
+            return jsonify(users_list), 200
+        except SQLAlchemyError as e:
+            return jsonify({"error": "Database error", "message": str(e)}), 500
+        except Exception as e:
+            return jsonify({"error": "Internal server error", "message": str(e)}), 500
 
 
 @admin_required
@@ -90,17 +93,15 @@ def delete_user_admin(user_id):
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return jsonify({"message": "User not found"}), 404
-        db.delete(user)
-        db.commit()
-        return jsonify({"message": "User deleted by admin"}), 200
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({"error": "Database error", "message": str(e)}), 500
-    finally:
-        db_generator.close()
+    with session_scope() as db:
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if not user:
+                return jsonify({"message": "User not found"}), 404
+            db.delete(user)
+            db.commit()
+            invalidate_user_cache(user_id)
+            return jsonify({"message": "User deleted by admin"}), 200
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({"error": "Database error", "message": str(e)}), 500
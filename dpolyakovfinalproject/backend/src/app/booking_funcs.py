@@ -1,12 +1,118 @@
 """
 Модуль с методами для бронирования мест
 """
-from flask import request, jsonify, g
-from src.database import get_db
-from src.models.booking import Booking
+import msgspec
+from flask import jsonify, g
+from src.database import session_scope, overlap_constraint_exists
+from src.models.booking import Booking, OVERLAP_CONSTRAINT_NAME
+from src.schemas import BookingIn, BookingMoveIn, decode_body
 from src.auth import login_required
-from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from src.cache import cache_add, cache_delete
+from sqlalchemy import select, update, exists
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from datetime import datetime, timezone
+
+try:
+    # C-парсер ISO 8601, быстрее fromisoformat и понимает суффикс Z
+    from ciso8601 import parse_datetime
+except ImportError:
+    parse_datetime = datetime.fromisoformat
+
+
+def _parse_utc(value):
+    """
+    Разбирает время ISO 8601 и приводит его к UTC.
+    Время без часового пояса считается указанным в UTC.
+    """
+    dt = parse_datetime(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _format_utc(dt):
+    """
+    Единый формат времени в ответах: ISO 8601 в UTC с явным смещением (+00:00).
+    Время без часового пояса (SQLite не хранит его) считается указанным в UTC.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+# Блокировка слота снимается сразу после записи брони; TTL (в секундах) нужен
+# только на случай, если процесс упадёт, не успев её снять
+BOOKING_LOCK_TTL = 10
+
+
+# Ограничение EXCLUDE уже найдено в базе; отсутствие не кэшируется и проверяется заново
+_overlap_constraint_confirmed = False
+
+
+def _needs_overlap_check(db):
+    """
+    В PostgreSQL пересечения броней отсекает ограничение EXCLUDE,
+    на остальных СУБД проверяем их запросом перед записью.
+    Пока ограничение в базе не найдено (init_db не смог его добавить),
+    проверка запросом остаётся и в PostgreSQL.
+    """
+    global _overlap_constraint_confirmed
+    if db.get_bind().dialect.name != 'postgresql':
+        return True
+    if not _overlap_constraint_confirmed:
+        _overlap_constraint_confirmed = overlap_constraint_exists(db.connection())
+    return not _overlap_constraint_confirmed
+
+
+def _is_overlap_violation(error):
+    """
+    Проверяет, что IntegrityError вызван нарушением ограничения на пересечение броней.
+    """
+    return OVERLAP_CONSTRAINT_NAME in str(error.orig)
+
+
+def _not_updated_response(db, booking_id):
+    """
+    Условный UPDATE не затронул ни одной строки: отдельным SELECT id
+    выясняем, нет такого бронирования (404) или оно уже не активно (400).
+    """
+    db.rollback()
+    found = db.execute(
+        select(Booking.id).where(Booking.id == booking_id, Booking.user_id == g.current_user.id)
+    ).first()
+    if found is None:
+        return jsonify({'error': 'Бронирование не найдено'}), 404
+    return jsonify({'error': 'Бронирование уже отменено или завершено'}), 400
+
+
+def _select_own_booking(db, booking_id):
+    """
+    Читает место, статус и версию своего бронирования одним SELECT по колонкам.
+    Возвращает None, если бронирования нет или оно принадлежит другому пользователю.
+    """
+    return db.execute(
+        select(Booking.place_id, Booking.status, Booking.version)
+        .where(Booking.id == booking_id, Booking.user_id == g.current_user.id)
+    ).first()
+
+
+def _update_if_unchanged(db, booking_id, version, **values):
+    """
+    Обновляет бронирование, только если его версия не изменилась с момента чтения
+    (оптимистичная блокировка по version). Возвращает False, если строку
+    успел изменить другой запрос.
+    """
+    result = db.execute(
+        update(Booking)
+        .where(Booking.id == booking_id, Booking.version == version)
+        .values(version=version + 1, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _stale_response():
+    return jsonify({'error': 'Бронирование было изменено другим запросом, повторите попытку'}), 409
 
 
 @login_required
@@ -33,53 +139,63 @@ def create_booking():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    data = request.get_json()
+    try:
+        body = decode_body(BookingIn)
+    except msgspec.MsgspecError as e:
+        return jsonify({'error': 'Необходимо указать place_id, start_time, end_time', 'message': str(e)}), 400
     user_id = g.current_user.id     # после авторизации тут лежит user
-    place_id = data.get('place_id')
-    start_time = data.get('start_time')
-    end_time = data.get('end_time')
-    if not (place_id and start_time and end_time):
-        return jsonify({'error': 'Необходимо указать place_id, start_time, end_time'}), 400
+    place_id = body.place_id
     try:
-        start_dt = datetime.fromisoformat(start_time)
-        end_dt = datetime.fromisoformat(end_time)
+        start_dt = _parse_utc(body.start_time)
+        end_dt = _parse_utc(body.end_time)
     except Exception:
         return jsonify({'error': 'Неверный формат даты/времени'}), 400
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        # проверяем нет ли брони на это время
-        conflict = db.query(Booking).filter(
-            Booking.place_id == place_id,
-            Booking.status == 'active',
-            Booking.end_time > start_dt,
-            Booking.start_time < end_dt
-        ).first()
-        if conflict:
-            return jsonify({'error': 'Место уже забронировано на это время'}), 409
-        booking = Booking(
-            user_id=user_id,
-            place_id=place_id,
-            start_time=start_dt,
-            end_time=end_dt,
-            status='active'
-        )
-        db.add(booking)
-        db.commit()
-        db.refresh(booking)
-        return jsonify({
-            'id': booking.id,
-            'place_id': booking.place_id,
-            'user_id': booking.user_id,
-            'start_time': booking.start_time.isoformat(),
-            'end_time': booking.end_time.isoformat(),
-            'status': booking.status
-        }), 201
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+
+    # Конкуренты за тот же слот отсеиваются в Redis, не доходя до базы
+    lock_key = f'lock:place:{place_id}:{start_dt.isoformat()}:{end_dt.isoformat()}'
+    if not cache_add(lock_key, '1', BOOKING_LOCK_TTL):
+        return jsonify({'error': 'Место уже забронировано на это время'}), 409
+
+    with session_scope() as db:
+        try:
+            # проверяем нет ли брони на это время (в PostgreSQL это делает ограничение EXCLUDE)
+            if _needs_overlap_check(db):
+                conflict = db.query(exists().where(
+                    Booking.place_id == place_id,
+                    Booking.status == 'active',
+                    Booking.end_time > start_dt,
+                    Booking.start_time < end_dt
+                )).scalar()
+                if conflict:
+                    return jsonify({'error': 'Место уже забронировано на это время'}), 409
+            booking = Booking(
+                user_id=user_id,
+                place_id=place_id,
+                start_time=start_dt,
+                end_time=end_dt,
+                status='active'
+            )
+            db.add(booking)
+            db.commit()
+            return jsonify({
+                'id': booking.id,
+                'place_id': booking.place_id,
+                'user_id': booking.user_id,
+                'start_time': _format_utc(booking.start_time),
+                'end_time': _format_utc(booking.end_time),
+                'status': booking.status
+            }), 201
+        except IntegrityError as e:
+            db.rollback()
+            if _is_overlap_violation(e):
+                return jsonify({'error': 'Место уже забронировано на это время'}), 409
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
+        finally:
+            # После commit/rollback слот охраняет сама база, блокировка больше не нужна
+            cache_delete(lock_key)
 
 
 @login_required
@@ -108,25 +224,26 @@ def list_my_bookings():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        bookings = db.query(Booking).filter(Booking.user_id == g.current_user.id).order_by(
-            Booking.start_time.desc()).all()
-        result = []
-        for b in bookings:
-            result.append({
-                'id': b.id,
-                'place_id': b.place_id,
-                'start_time': b.start_time.isoformat(),
-                'end_time': b.end_time.isoformat(),
-                'status': b.status
-            })
-        return jsonify(result), 200
-    except SQLAlchemyError as e:
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+    with session_scope() as db:
+        try:
+            bookings = db.execute(
+                select(Booking.id, Booking.place_id, Booking.start_time, Booking.end_time, Booking.status)
+                .where(Booking.user_id == g.current_user.id)
+                .order_by(Booking.start_time.desc())
+                .execution_options(yield_per=500)
+            )
+            result = []
+            for b in bookings:
+                result.append({
+                    'id': b.id,
+                    'place_id': b.place_id,
+                    'start_time': _format_utc(b.start_time),
+                    'end_time': _format_utc(b.end_time),
+                    'status': b.status
+                })
+            return jsonify(result), 200
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
 
 @login_required
@@ -153,23 +270,23 @@ def cancel_booking(booking_id):
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        booking = db.query(Booking).filter(Booking.id == booking_id, Booking.user_id == g.current_user.id).first()
-        if not booking:
-            return jsonify({'error': 'Бронирование не найдено'}), 404
-        if booking.status != 'active':
-            return jsonify({'error': 'Бронирование уже отменено или завершено'}), 400
-        booking.status = 'cancelled'
-        db.add(booking)
-        db.commit()
-        return jsonify({'message': 'Бронирование отменено'}), 200
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+    with session_scope() as db:
+        try:
+            # Проверка статуса и отмена одним атомарным UPDATE, SELECT только при неудаче.
+            # Версия растёт, чтобы параллельный перенос этой брони получил 409
+            result = db.execute(
+                update(Booking)
+                .where(Booking.id == booking_id, Booking.user_id == g.current_user.id, Booking.status == 'active')
+                .values(status='cancelled', version=Booking.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                return _not_updated_response(db, booking_id)
+            db.commit()
+            return jsonify({'message': 'Бронирование отменено'}), 200
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
 
 @login_required
@@ -198,39 +315,42 @@ def move_booking(booking_id):
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    data = request.get_json()
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        booking = db.query(Booking).filter(Booking.id == booking_id, Booking.user_id == g.current_user.id).first()
-        if not booking:
-            return jsonify({'error': 'Бронирование не найдено'}), 404
-        if booking.status != 'active':
-            return jsonify({'error': 'Бронирование уже отменено или завершено'}), 400
+    with session_scope() as db:
         try:
-            start_dt = datetime.fromisoformat(data.get('start_time'))
-            end_dt = datetime.fromisoformat(data.get('end_time'))
-        except Exception:
-            return jsonify({'error': 'Неверный формат даты/времени'}), 400
-
-        # Проверяем на наличие пересечений
-        is_problem = db.query(Booking).filter(
-            Booking.place_id == booking.place_id,
-            Booking.status == 'active',
-            Booking.id != booking.id,
-            Booking.end_time > start_dt,
-            Booking.start_time < end_dt
-        ).first()
-        if is_problem:
-            return jsonify({'error': 'Место уже забронировано на это время'}), 409
-
-        booking.start_time = start_dt
-        booking.end_time = end_dt
-        db.add(booking)
-        db.commit()
-        return jsonify({'message': 'Бронирование перенесено'}), 200
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+            booking = _select_own_booking(db, booking_id)
+            if booking is None:
+                return jsonify({'error': 'Бронирование не найдено'}), 404
+            if booking.status != 'active':
+                return jsonify({'error': 'Бронирование уже отменено или завершено'}), 400
+            try:
+                body = decode_body(BookingMoveIn)
+                start_dt = _parse_utc(body.start_time)
+                end_dt = _parse_utc(body.end_time)
+            except Exception:
+                return jsonify({'error': 'Неверный формат даты/времени'}), 400
+
+            # Проверяем на наличие пересечений (в PostgreSQL это делает ограничение EXCLUDE)
+            if _needs_overlap_check(db):
+                is_problem = db.query(exists().where(
+                    Booking.place_id == booking.place_id,
+                    Booking.status == 'active',
+                    Booking.id != booking_id,
+                    Booking.end_time > start_dt,
+                    Booking.start_time < end_dt
+                )).scalar()
+                if is_problem:
+                    return jsonify({'error': 'Место уже забронировано на это время'}), 409
+
+            if not _update_if_unchanged(db, booking_id, booking.version, start_time=start_dt, end_time=end_dt):
+                db.rollback()
+                return _stale_response()
+            db.commit()
+            return jsonify({'message': 'Бронирование перенесено'}), 200
+        except IntegrityError as e:
+            db.rollback()
+            if _is_overlap_violation(e):
+                return jsonify({'error': 'Место уже забронировано на это время'}), 409
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
@@ -1,12 +1,32 @@
 """
 Модуль с методами для управлениями местами
 """
-from flask import request, jsonify
-from src.database import get_db
+import msgspec
+from flask import jsonify, current_app, Response
+from src.cache import cache_get, cache_set, cache_delete
+from src.database import session_scope
 from src.models.place import Place
+from src.schemas import PlaceIn, decode_body
 from src.auth import login_required, admin_required
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
+# Готовый JSON списка мест хранится в Redis (в секундах)
+PLACES_CACHE_KEY = 'places:all'
+PLACES_CACHE_TTL = 120
+
+
+def _places_cache_get():
+    return cache_get(PLACES_CACHE_KEY)
+
+
+def _places_cache_set(body):
+    cache_set(PLACES_CACHE_KEY, body, PLACES_CACHE_TTL)
+
+
+def _places_cache_invalidate():
+    cache_delete(PLACES_CACHE_KEY)
+
 
 def list_places():
     """
@@ -27,24 +47,30 @@ def list_places():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        places = db.query(Place).all()
-        result = []
-        for p in places:
-            result.append({
-                'id': p.id,
-                'name': p.name,
-                'location': p.location,
-                'description': p.description,
-                'is_available': p.is_available
-            })
-        return jsonify(result), 200
-    except SQLAlchemyError as e:
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+    cached = _places_cache_get()
+    if cached is not None:
+        return Response(cached, mimetype='application/json'), 200
+
+    with session_scope() as db:
+        try:
+            places = db.execute(
+                select(Place.id, Place.name, Place.location, Place.description, Place.is_available)
+                .execution_options(yield_per=500)
+            )
+            result = []
+            for p in places:
+                result.append({
+                    'id': p.id,
+                    'name': p.name,
+                    'location': p.location,
+                    'description': p.description,
+                    'is_available': p.is_available
+                })
+            body = current_app.json.dumps(result)
+            _places_cache_set(body)
+            return Response(body, mimetype='application/json'), 200
+        except SQLAlchemyError as e:
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
 
 @login_required
@@ -89,33 +115,31 @@ def create_place():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    data = request.get_json()
-    name = data.get('name')
-    location = data.get('location')
-    description = data.get('description')
-    is_available = data.get('is_available', True)
-    if not name:
-        return jsonify({'error': 'Название места обязательно'}), 400
-    db_generator = get_db()
-    db = next(db_generator)
     try:
-        place = Place(
-            name=name,
-            location=location,
-            description=description,
-            is_available=is_available
-        )
-        db.add(place)
-        db.commit()
-        db.refresh(place)
-        return jsonify(
-            {'id': place.id, 'name': place.name, 'location': place.location, 'description': place.description,
-             'is_available': place.is_available}), 201
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({'error': 'Database error', 'message': str(e)}), 500
-    finally:
-        db_generator.close()
+        body = decode_body(PlaceIn)
+    except msgspec.MsgspecError as e:
+        return jsonify({'error': 'Название места обязательно', 'message': str(e)}), 400
+    name = body.name
+    location = body.location
+    description = body.description
+    is_available = body.is_available
+    with session_scope() as db:
+        try:
+            place = Place(
+                name=name,
+                location=location,
+                description=description,
+                is_available=is_available
+            )
+            db.add(place)
+            db.commit()
+            _places_cache_invalidate()
+            return jsonify(
+                {'id': place.id, 'name': place.name, 'location': place.location, 'description': place.description,
+                 'is_available': place.is_available}), 201
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({'error': 'Database error', 'message': str(e)}), 500
 
 
 @admin_required
@@ -153,17 +177,15 @@ def delete_place(place_id):
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    db_generator = get_db()
-    db = next(db_generator)
-    try:
-        place = db.query(Place).filter(Place.id == place_id).first()
-        if not place:
-            return jsonify({"error": "Место не найдено"}), 404
-        db.delete(place)
-        db.commit()
-        return jsonify({"message": "Место удалено"}), 200
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({"error": "Database error", "message": str(e)}), 500
-    finally:
-        db_generator.close()
+    with session_scope() as db:
+        try:
+            place = db.query(Place).filter(Place.id == place_id).first()
+            if not place:
+                return jsonify({"error": "Место не найдено"}), 404
+            db.delete(place)
+            db.commit()
+            _places_cache_invalidate()
+            return jsonify({"message": "Место удалено"}), 200
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({"error": "Database error", "message": str(e)}), 500
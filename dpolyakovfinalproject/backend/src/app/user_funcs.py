@@ -1,11 +1,22 @@
 """
 Модуль с методами для пользователей
 """
-from flask import request, jsonify, g
-from src.database import get_db
+import msgspec
+from flask import jsonify, g, Response
+from src.cache import cache_get
+from src.database import session_scope
 from src.models.user import User
-from src.auth import login_required, hash_password
+from src.schemas import RegisterIn, decode_body
+from src.auth import login_required, basic_auth_required, hash_password, issue_session_token, SESSION_TOKEN_TTL
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# INSERT с поддержкой ON CONFLICT для каждой СУБД
+_INSERT_BY_DIALECT = {
+    'postgresql': pg_insert,
+    'sqlite': sqlite_insert,
+}
 
 
 def register_user():
@@ -31,33 +42,33 @@ def register_user():
       500:
         $ref: '#/components/responses/InternalServerError'
     """
-    data = request.get_json()
-    if not data or not all(k in data for k in ('username', 'email', 'password')):
-        return jsonify({"error": "Missing required fields (username, email, password)"}), 400
-    username = data.get('username')
-    email = data.get('email')
-    password = data.get('password')
-    hashed_password = hash_password(password)
-    db_generator = get_db()
-    db = next(db_generator)
-
     try:
-        # Пытаемся найти пользователя с такими же данными при регистрации
-        existing_user = db.query(User).filter((User.username == username) | (User.email == email)).first()
-        if existing_user:
-            return jsonify({"error": "Username or email already exists"}), 409
-        new_user = User(username=username, email=email, hashed_password=hashed_password, is_admin=False)
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        return jsonify({"message": "User registered successfully", "user_id": new_user.id}), 201
-    except SQLAlchemyError as e:
-        db.rollback()
-        return jsonify({"error": "Database error", "message": str(e)}), 500
-    except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
-    finally:
-        db_generator.close()
+        body = decode_body(RegisterIn)
+    except msgspec.MsgspecError as e:
+        return jsonify({"error": "Missing required fields (username, email, password)", "message": str(e)}), 400
+    username = body.username
+    email = body.email
+    password = body.password
+    hashed_password = hash_password(password)
+    with session_scope() as db:
+        try:
+            # Вставка и проверка уникальности username/email за один запрос:
+            # при конфликте строка не вставляется и RETURNING ничего не возвращает
+            insert = _INSERT_BY_DIALECT[db.get_bind().dialect.name]
+            stmt = insert(User).values(
+                username=username, email=email, hashed_password=hashed_password, is_admin=False
+            ).on_conflict_do_nothing().returning(User.id)
+            user_id = db.execute(stmt).scalar()
+            if user_id is None:
+                db.rollback()
+                return jsonify({"error": "Username or email already exists"}), 409
+            db.commit()
+            return jsonify({"message": "User registered successfully", "user_id": user_id}), 201
+        except SQLAlchemyError as e:
+            db.rollback()
+            return jsonify({"error": "Database error", "message": str(e)}), 500
+        except Exception as e:
+            return jsonify({"error": "Internal server error", "message": str(e)}), 500
 
 
 @login_required
@@ -79,6 +90,10 @@ def get_current_user_info():
         $ref: '#/components/responses/InternalServerError'
     """
     user = g.current_user   # помним, что в g. лежит пользователь после авторизации
+    # login_required уже положил эти данные в кэш user:{id}, отдаём их как есть
+    cached = cache_get(f"user:{user.id}")
+    if cached is not None:
+        return Response(cached, mimetype='application/json'), 200
     user_data = {
         "id": user.id,
         "username": user.username,
@@ -86,3 +101,34 @@ def get_current_user_info():
         "is_admin": user.is_admin
     }
     return jsonify(user_data), 200
+
+
+@basic_auth_required
+def login():
+    """
+    Получить сессионный токен для заголовка "Authorization: Bearer <token>".
+    Требует логин и пароль (Basic Auth), существующим токеном новый не выдаётся.
+    ---
+    tags:
+      - Users
+    summary: Получить сессионный токен
+    security:
+      - basicAuth: []
+    responses:
+      200:
+        description: Токен выдан.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                token:
+                  type: string
+                expires_in:
+                  type: integer
+                  description: Время жизни токена в секундах
+      401:
+        $ref: '#/components/responses/UnauthorizedError'
+    """
+    token = issue_session_token(g.current_user)
+    return jsonify({"token": token, "expires_in": SESSION_TOKEN_TTL}), 200
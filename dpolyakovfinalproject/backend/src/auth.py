@@ -2,25 +2,58 @@
 Модуль для реализации базовой аутентификации и авторизации
 """
 import base64
+import hashlib
 from functools import wraps
-from flask import request, jsonify, g
-from werkzeug.security import generate_password_hash, check_password_hash
-from src.database import get_db
+from flask import request, jsonify, g, current_app
+from itsdangerous import TimestampSigner, BadSignature
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from werkzeug.security import check_password_hash
+from src.cache import cache_get, cache_set, cache_delete
+from src.database import session_scope
 from src.models.user import User
 
+# Время жизни кэша аутентификации и данных пользователя (в секундах)
+AUTH_CACHE_TTL = 300
+
+# Время жизни сессионного токена (в секундах)
+SESSION_TOKEN_TTL = 900
+
+# Argon2id: ~64 МиБ памяти и 2 прохода на хэш
+PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+_password_hasher = PASSWORD_HASHER
+
 
 def hash_password(password):
     """
-    Хэширования пароля с помощья Werkzeug.
+    Хэширования пароля с помощья Argon2.
     """
-    return generate_password_hash(password)
+    return _password_hasher.hash(password)
+
+
+def _is_argon2_hash(s_hash):
+    return s_hash.startswith('$argon2')
 
 
 def verify_password(s_hash, provided_password):
     """
     Проверяет совпадает ли хэш и полученный пароль.
+    Старые хэши Werkzeug (pbkdf2/scrypt) проверяются через Werkzeug.
+    """
+    if not _is_argon2_hash(s_hash):
+        return check_password_hash(s_hash, provided_password)
+    try:
+        return _password_hasher.verify(s_hash, provided_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(s_hash):
+    """
+    Нужно ли перехэшировать пароль: хэш в старом формате Werkzeug
+    или Argon2 с устаревшими параметрами.
     """
-    return check_password_hash(s_hash, provided_password)
+    return not _is_argon2_hash(s_hash) or _password_hasher.check_needs_rehash(s_hash)
 
 
 def authenticate_basic():
@@ -48,10 +81,145 @@ def authenticate_basic():
         return None
 
 
+def _auth_cache_key(auth_header):
+    """
+    Ключ кэша для заголовка Authorization. Сам заголовок (с паролем)
+    в Redis не хранится, только его sha256.
+    """
+    return f"auth:{hashlib.sha256(auth_header.encode()).hexdigest()}"
+
+
+def _cache_user(user):
+    """
+    Кладёт данные пользователя в кэш под ключом user:{id}.
+    Это готовое тело ответа /api/users/me.
+    """
+    cache_set(f"user:{user.id}", current_app.json.dumps({
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_admin": user.is_admin
+    }), AUTH_CACHE_TTL)
+
+
+def _load_cached_user(user_id):
+    """
+    Возвращает пользователя по id из кэша user:{id}, а при промахе - из базы.
+    Если пользователь удалён, возвращает None.
+    """
+    cached = cache_get(f"user:{user_id}")
+    if cached is not None:
+        return User(**current_app.json.loads(cached))
+
+    with session_scope() as db:
+        user = db.get(User, user_id)
+        if user is not None:
+            _cache_user(user)
+        return user
+
+
+def invalidate_user_cache(user_id):
+    """
+    Сбрасывает закэшированные данные пользователя (при удалении или изменении).
+    Ключи auth:* указывают на id и после этого перестают проходить проверку.
+    """
+    cache_delete(f"user:{user_id}")
+
+
+def _token_signer():
+    return TimestampSigner(current_app.config['SECRET_KEY'], salt='session-token')
+
+
+def issue_session_token(user):
+    """
+    Выдаёт подписанный HMAC токен с id пользователя и временем выдачи.
+    Токен проверяется без обращения к базе и без хэширования пароля.
+    """
+    return _token_signer().sign(str(user.id)).decode('utf-8')
+
+
+def authenticate_bearer():
+    """
+    Проверяет токен из заголовка "Authorization: Bearer <token>".
+    Возвращает id пользователя или None, если токена нет, он подделан или истёк.
+    """
+    parts = request.headers.get('Authorization', '').split(None, 1)
+    if len(parts) != 2:
+        return None
+    token = parts[1].strip()
+    try:
+        return int(_token_signer().unsign(token, max_age=SESSION_TOKEN_TTL))
+    except (BadSignature, ValueError):
+        return None
+
+
+def _bearer_user():
+    """
+    Авторизация по сессионному токену Bearer.
+    Возвращает (user, None) или (None, ответ с ошибкой).
+    """
+    user_id = authenticate_bearer()
+    if user_id is None:
+        return None, (jsonify({"message": "Invalid or expired token"}), 401)
+    try:
+        user = _load_cached_user(user_id)
+    except Exception as e:
+        return None, (jsonify({"error": "Authentication failed", "message": str(e)}), 500)
+    if user is None:
+        return None, (jsonify({"message": "Invalid credentials"}), 401)
+    return user, None
+
+
+def _basic_user():
+    """
+    Авторизация по логину и паролю из заголовка Basic Auth.
+    После успешной проверки id пользователя кэшируется по хэшу заголовка,
+    поэтому повторные запросы того же клиента не проверяют пароль заново.
+    Возвращает (user, None) или (None, ответ с ошибкой).
+    """
+    info = authenticate_basic()
+    if not info:
+        return None, (jsonify({"message": "Authentication required"}), 401)
+
+    auth_key = _auth_cache_key(request.headers['Authorization'])
+    cached_user_id = cache_get(auth_key)
+    if cached_user_id is not None:
+        try:
+            user = _load_cached_user(int(cached_user_id))
+        except Exception as e:
+            return None, (jsonify({"error": "Authentication failed", "message": str(e)}), 500)
+
+        if user is not None:
+            return user, None
+        cache_delete(auth_key)
+
+    username, password = info
+    with session_scope() as db:
+        try:
+            user = db.query(User).filter_by(username=username).first()
+
+            if user is None or not verify_password(user.hashed_password, password):
+                return None, (jsonify({"message": "Invalid credentials"}), 401)
+
+            # Пароль верный, поэтому можно обновить хэш старого формата
+            if password_needs_rehash(user.hashed_password):
+                user.hashed_password = hash_password(password)
+                db.commit()
+
+            cache_set(auth_key, user.id, AUTH_CACHE_TTL)
+            _cache_user(user)
+
+        except Exception as e:
+            return None, (jsonify({"error": "Authentication failed", "message": str(e)}), 500)
+
+    return user, None
+
+
 def login_required(f):
     """
     Декоратор для защиты эндпоинтов, требующих авторизации.
-    Извлекает учетные данные из заголовка Basic Auth, ищет пользователя
+    Принимает сессионный токен Bearer (см. /api/login), а иначе извлекает
+    учетные данные из заголовка Basic Auth, ищет пользователя
     в базе данных и проверяет пароль.
     Если авторизация успешна, сохраняет объект пользователя в g.current_user
     и вызывает декоратор.
@@ -60,28 +228,35 @@ def login_required(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        info = authenticate_basic()
-        if not info:
-            return jsonify({"message": "Authentication required"}), 401
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header[:7].lower() == 'bearer ':
+            user, error = _bearer_user()
+        else:
+            user, error = _basic_user()
+        if error is not None:
+            return error
 
-        username, password = info
-        db_generator = get_db()
-        db = next(db_generator)
+        # Сохраняем пользователя в контекст запроса
+        g.current_user = user
+        return f(*args, **kwargs)
 
-        try:
-            user = db.query(User).filter_by(username=username).first()
+    return decorated_function
 
-            if user is None or not verify_password(user.hashed_password, password):
-                return jsonify({"message": "Invalid credentials"}), 401
 
-            # Сохраняем пользователя в контекст запроса
-            g.current_user = user
+def basic_auth_required(f):
+    """
+    Декоратор для эндпоинтов, которым нужен именно пароль (выдача токена в /api/login).
+    Принимает только Basic Auth: токеном Bearer нельзя получить новый токен,
+    иначе утёкший токен продлевался бы бесконечно и SESSION_TOKEN_TTL ничего бы не ограничивал.
+    """
 
-        except Exception as e:
-            return jsonify({"error": "Authentication failed", "message": str(e)}), 500
-        finally:
-            db_generator.close()
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user, error = _basic_user()
+        if error is not None:
+            return error
 
+        g.current_user = user
         return f(*args, **kwargs)
 
     return decorated_function
@@ -0,0 +1,66 @@
+"""
+Модуль для работы с кэшем Redis.
+Если REDIS_URL не задан (или пакет redis не установлен), кэш отключён:
+чтение всегда промахивается, запись и удаление ничего не делают.
+"""
+import os
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis необязателен для локального запуска
+    redis = None
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+redis_client = redis.Redis.from_url(REDIS_URL) if redis is not None and REDIS_URL else None
+
+
+def cache_get(key):
+    """
+    Возвращает значение по ключу или None, если кэш отключён,
+    ключа нет или Redis недоступен.
+    """
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except redis.RedisError:
+        return None
+
+
+def cache_set(key, value, ttl):
+    """
+    Сохраняет значение по ключу на ttl секунд.
+    """
+    if redis_client is None:
+        return
+    try:
+        redis_client.setex(key, ttl, value)
+    except redis.RedisError:
+        pass
+
+
+def cache_add(key, value, ttl):
+    """
+    Атомарно сохраняет значение, только если ключа ещё нет (SET NX EX).
+    Возвращает False, если ключ уже занят. Без Redis или при его
+    недоступности возвращает True, чтобы не блокировать запрос.
+    """
+    if redis_client is None:
+        return True
+    try:
+        return bool(redis_client.set(key, value, nx=True, ex=ttl))
+    except redis.RedisError:
+        return True
+
+
+def cache_delete(*keys):
+    """
+    Удаляет ключи из кэша.
+    """
+    if redis_client is None or not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError:
+        pass
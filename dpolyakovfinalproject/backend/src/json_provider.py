@@ -0,0 +1,26 @@
+"""
+Модуль с JSON-провайдером Flask на основе orjson
+"""
+import orjson
+from flask.json.provider import JSONProvider
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Заменяет стандартный json в jsonify, request.get_json и тестовом клиенте.
+    orjson в несколько раз быстрее и сам сериализует datetime в ISO 8601.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Собирает JSON-ответ сразу из bytes, без промежуточного decode в str.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
@@ -1,10 +1,17 @@
 """
 Модуль определения модели бронирования (Booking)
 """
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, DDL, Index, event, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.sql import func
 from src.models.base import Base
 
+# Имя ограничения, запрещающего пересечение активных броней одного места
+OVERLAP_CONSTRAINT_NAME = 'bookings_no_overlap'
+
+# Возможные статусы бронирования (в PostgreSQL - тип ENUM booking_status)
+BOOKING_STATUSES = ('active', 'cancelled', 'completed')
+
 
 class Booking(Base):
     """
@@ -12,15 +19,45 @@ class Booking(Base):
     """
     __tablename__ = 'bookings'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     place_id = Column(Integer, ForeignKey('places.id'), nullable=False)
-    start_time = Column(DateTime, nullable=False)
-    end_time = Column(DateTime, nullable=False)
-    status = Column(String, default='active', nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    # Время хранится с часовым поясом (timestamptz), приложение пишет его в UTC
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    status = Column(Enum(*BOOKING_STATUSES, name='booking_status'), server_default='active', nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Номер версии строки для оптимистичной блокировки
+    version = Column(Integer, nullable=False, default=1)
+
+    # Пересечения активных броней отсекает сама БД, это безопасно при конкурентных запросах.
+    # Ограничение есть только в PostgreSQL (нужно расширение btree_gist)
+    __table_args__ = (
+        ExcludeConstraint(
+            (place_id, '='),
+            (func.tstzrange(start_time, end_time, text("'[)'")), '&&'),
+            name=OVERLAP_CONSTRAINT_NAME,
+            using='gist',
+            where=(status == 'active'),
+        ).ddl_if(dialect='postgresql'),
+        # Поиск пересечений по месту, статусу и времени
+        Index('ix_bookings_place_status_time', 'place_id', 'status', 'start_time', 'end_time'),
+        # Список броней пользователя, отсортированный по началу
+        Index('ix_bookings_user_start', 'user_id', start_time.desc()),
+    )
+
+    # Конкурентное изменение одной брони через ORM приводит к StaleDataError вместо потерянного
+    # обновления; Core UPDATE в booking_funcs сверяет version в WHERE сам
+    __mapper_args__ = {'version_id_col': version}
 
     def __repr__(self):
         return (f"<Booking(id={self.id}, user_id={self.user_id}, place_id={self.place_id}, "
                 f"start={self.start_time}, end={self.end_time}, status={self.status})>")
+
+
+event.listen(
+    Booking.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS btree_gist').execute_if(dialect='postgresql')
+)
@@ -0,0 +1,54 @@
+"""
+Модуль со схемами тел запросов.
+Тело разбирается и проверяется msgspec за один проход прямо из байтов запроса.
+"""
+from typing import Annotated, Optional
+
+import msgspec
+from flask import request
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class RegisterIn(msgspec.Struct):
+    """
+    Тело запроса регистрации пользователя
+    """
+    username: str
+    email: str
+    password: str
+
+
+class PlaceIn(msgspec.Struct):
+    """
+    Тело запроса создания места
+    """
+    name: NonEmptyStr
+    location: Optional[str] = None
+    description: Optional[str] = None
+    is_available: bool = True
+
+
+class BookingIn(msgspec.Struct):
+    """
+    Тело запроса создания бронирования
+    """
+    place_id: Annotated[int, msgspec.Meta(gt=0)]
+    start_time: NonEmptyStr
+    end_time: NonEmptyStr
+
+
+class BookingMoveIn(msgspec.Struct):
+    """
+    Тело запроса переноса бронирования
+    """
+    start_time: NonEmptyStr
+    end_time: NonEmptyStr
+
+
+def decode_body(schema):
+    """
+    Разбирает JSON-тело текущего запроса в объект схемы schema.
+    При некорректном JSON или несоответствии схеме бросает msgspec.MsgspecError.
+    """
+    return msgspec.json.decode(request.get_data(cache=False), type=schema)
@@ -1,10 +1,27 @@
+# Общие фикстуры (app, client, заголовки авторизации, пользователи) определены только здесь;
+# в тестовых модулях объявляются лишь фикстуры, нужные одному модулю
+import functools
+import os
+from collections import namedtuple
 import pytest
+
+# Без явного DATABASE_URL тесты идут на SQLite в памяти: одно соединение (StaticPool,
+# src.database выбирает его сам) держит базу живой всю сессию. Переменную нужно задать
+# до импорта src.database.
+# При запуске через pytest-xdist (pytest -n auto) каждый воркер - отдельный процесс
+# со своей базой в памяти, общего состояния между воркерами нет
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite://"
+
+from argon2 import PasswordHasher
 from testcontainers.postgres import PostgresContainer
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from src import create_app
-from src.database import Base
+from src.database import Base, SessionLocal, engine, init_db, enable_raiseload, disable_raiseload
 from src.models.user import User
+import src.auth
+import src.cache
 from src.auth import hash_password
 import base64
 
@@ -19,40 +36,184 @@ def postgres_engine():
         engine.dispose()
 
 
-# Фикстура для создания новой сессии и чистой схемы
+# Сессия внутри внешней транзакции: схема создаётся один раз в postgres_engine,
+# а всё записанное тестом (включая commit) откатывается после него
 @pytest.fixture(scope='function')
 def db_session(postgres_engine):
-    Session = sessionmaker(bind=postgres_engine)
+    connection = postgres_engine.connect()
+    transaction = connection.begin()
+    Session = sessionmaker(bind=connection, expire_on_commit=False,
+                           join_transaction_mode="create_savepoint")
     session = Session()
     yield session
-    session.rollback()
     session.close()
+    transaction.rollback()
+    connection.close()
 
 
-# Фикстура для Flask-приложения
-@pytest.fixture(scope="session")
-def app():
+# Запрет ленивой подгрузки связей во всех тестах: N+1 падает сразу
+@pytest.fixture(autouse=True)
+def raiseload_all():
+    enable_raiseload()
+    yield
+    disable_raiseload()
+
+
+# pysqlite сам управляет транзакциями и ломает SAVEPOINT: отдаём BEGIN в руки SQLAlchemy
+def _enable_sqlite_savepoints(bind):
+    @event.listens_for(bind, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(bind, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+# Конфигурация тестового приложения
+TEST_CONFIG = {'TESTING': True}
+
+
+# Готовое приложение на каждую конфигурацию (ключ - frozenset пар конфига), маршруты
+# и Swagger регистрируются один раз, сколько бы фикстур его ни запросило
+@functools.lru_cache(maxsize=8)
+def _build_app(config_key):
     app = create_app()
-    app.config['TESTING'] = True
+    app.config.update(dict(config_key))
+    return app
+
+
+# Боевой Argon2 (64 МиБ, 2 прохода) - самая дорогая часть каждой регистрации и логина.
+# В тестах используется Argon2 с минимальными параметрами, формат хэшей тот же
+@pytest.fixture(scope="session")
+def fast_password_hashing():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(src.auth, '_password_hasher', PasswordHasher(time_cost=1, memory_cost=8, parallelism=1))
+        yield
+
+
+# Для тестов с маркером real_password_hash возвращаем боевой хэшер
+@pytest.fixture(autouse=True)
+def real_password_hashing(request, monkeypatch):
+    if request.node.get_closest_marker('real_password_hash'):
+        monkeypatch.setattr(src.auth, '_password_hasher', src.auth.PASSWORD_HASHER)
+
+
+# Фикстура для Flask-приложения: приложение и схема БД создаются один раз на сессию
+@pytest.fixture(scope="session")
+def app(fast_password_hashing):
+    if engine.dialect.name == 'sqlite':
+        _enable_sqlite_savepoints(engine)
+    app = _build_app(frozenset(TEST_CONFIG.items()))
+    with app.app_context():
+        init_db()
     yield app
 
 
-# Фикстура для тестового клиента Flask
-@pytest.fixture(scope="function")
+# Каждый тест идёт внутри внешней транзакции, которая откатывается после теста.
+# commit в коде приложения фиксирует только SAVEPOINT внутри неё.
+# Настройки SessionLocal сохраняются и после теста возвращаются как были
+@pytest.fixture(autouse=True)
+def db_reset(app):
+    connection = engine.connect()
+    transaction = connection.begin()
+    session_kw = SessionLocal.kw.copy()
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    yield
+    SessionLocal.kw = session_kw
+    transaction.rollback()
+    connection.close()
+
+
+# Зарегистрированный пользователь; id берётся из ответа /api/register
+SeededUser = namedtuple('SeededUser', 'email password id')
+
+# Пользователи, заранее зарегистрированные на всю сессию: username -> (email, password)
+SEEDED_USERS = {
+    'user1': ('user1@example.com', 'pass1'),
+    'user2': ('user2@example.com', 'pass2'),
+    'user5': ('user5@example.com', 'pass5'),
+    'user6': ('user6@example.com', 'pass6'),
+    'user7': ('user7@example.com', 'pass7'),
+    'booker': ('booker@example.com', 'pass'),
+}
+
+
+# Регистрация (с хэшированием пароля) один раз на сессию, до транзакций отдельных тестов,
+# поэтому эти пользователи переживают откат после каждого теста
+@pytest.fixture(scope="session")
+def seeded_users(app):
+    users = {}
+    with app.test_client() as client:
+        for username, (email, password) in SEEDED_USERS.items():
+            resp = client.post('/api/register', json={
+                'username': username, 'email': email, 'password': password
+            })
+            # Если регистрация сломалась, падаем здесь, а не невнятным 401 в зависимых тестах
+            assert resp.status_code == 201, (username, resp.status_code, resp.json)
+            users[username] = SeededUser(email, password, resp.json['user_id'])
+    return users
+
+
+class FakeRedis:
+    """
+    Redis в памяти процесса: только команды, которые использует src.cache. TTL не соблюдается.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.setex(key, ex, value)
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+# Включает кэш src.cache поверх FakeRedis на время теста
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(src.cache, 'redis_client', fake)
+    return fake
+
+
+# Фикстура для тестового клиента Flask: один клиент на модуль.
+# Авторизация передаётся заголовками, а соединение с БД откатывается в db_reset,
+# поэтому между тестами клиент состояния не переносит
+@pytest.fixture(scope="module")
 def client(app):
     with app.test_client() as client:
         yield client
 
 
+# Заголовок Basic Auth строится один раз на пару (username, password).
+# Возвращается общий словарь, изменять его в тестах нельзя
+@functools.lru_cache(maxsize=128)
+def _auth(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode('utf-8')).decode('utf-8')
+    return {'Authorization': f'Basic {token}'}
+
+
 # Basic Auth
-@pytest.fixture
+@pytest.fixture(scope="session")
 def basic_auth_headers():
-    def _headers(username, password):
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
-        return {'Authorization': f'Basic {token}'}
+    return _auth
 
-    return _headers
+
+# Basic Auth администратора, созданного в init_db
+@pytest.fixture(scope="session")
+def admin_headers():
+    return _auth('admin', 'admin123')
 
 
 # Создание пользователя напрямую в БД
@@ -67,7 +228,6 @@ def create_user(db_session):
         )
         db_session.add(user)
         db_session.commit()
-        db_session.refresh(user)
         return user
 
     return _create_user
@@ -0,0 +1,19 @@
+from sqlalchemy import event
+from src import create_app
+from src.database import SessionLocal, _add_raiseload, disable_raiseload
+
+
+def test_raiseload_enabled_from_env(monkeypatch):
+    disable_raiseload()
+    monkeypatch.setenv('SQLALCHEMY_RAISELOAD', '1')
+    app = create_app()
+    assert app.config['SQLALCHEMY_RAISELOAD'] is True
+    assert event.contains(SessionLocal, "do_orm_execute", _add_raiseload)
+
+
+def test_raiseload_off_by_default(monkeypatch):
+    disable_raiseload()
+    monkeypatch.delenv('SQLALCHEMY_RAISELOAD', raising=False)
+    monkeypatch.delenv('FLASK_DEBUG', raising=False)
+    create_app()
+    assert not event.contains(SessionLocal, "do_orm_execute", _add_raiseload)
@@ -1,9 +1,48 @@
-from src.auth import hash_password, verify_password
+import pytest
+from argon2 import PasswordHasher
+from werkzeug.security import generate_password_hash
+from src.auth import hash_password, verify_password, password_needs_rehash, PASSWORD_HASHER
+from src.database import session_scope
+from src.models.user import User
 
 
+@pytest.mark.real_password_hash
 def test_hash_and_verify_password():
     password = 'mysecret123'
     hashed = hash_password(password)
     assert hashed != password
     assert verify_password(hashed, password)
     assert not verify_password(hashed, 'wrongpass')
+
+
+def test_verify_legacy_werkzeug_hash():
+    password = 'mysecret123'
+    legacy = generate_password_hash(password)
+    assert verify_password(legacy, password)
+    assert not verify_password(legacy, 'wrongpass')
+    assert password_needs_rehash(legacy)
+    assert not password_needs_rehash(hash_password(password))
+
+
+# Успешный вход по Basic Auth заменяет хэш старого формата или со слабыми параметрами на текущий Argon2
+@pytest.mark.real_password_hash
+@pytest.mark.parametrize("old_hash", [
+    generate_password_hash('oldpass'),
+    PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash('oldpass'),
+], ids=['werkzeug', 'weak_argon2'])
+def test_login_rehashes_password(client, basic_auth_headers, old_hash):
+    with session_scope() as db:
+        user = User(username='legacy', email='legacy@example.com', hashed_password=old_hash)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    resp = client.get('/api/users/me', headers=basic_auth_headers('legacy', 'oldpass'))
+    assert resp.status_code == 200
+
+    with session_scope() as db:
+        new_hash = db.get(User, user_id).hashed_password
+    assert new_hash != old_hash
+    assert new_hash.startswith('$argon2')
+    assert not PASSWORD_HASHER.check_needs_rehash(new_hash)
+    assert verify_password(new_hash, 'oldpass')
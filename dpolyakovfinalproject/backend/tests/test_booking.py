@@ -1,89 +1,63 @@
 import pytest
-from src import create_app
-from src.database import init_db
-import base64
 from datetime import datetime, timedelta
+from sqlalchemy import update
+from src.app import booking_funcs
+from src.database import session_scope
+from src.models.booking import Booking
 
+# Неизменяемые интервалы, общие для всех сценариев
+H2 = timedelta(hours=2)
+H3 = timedelta(hours=3)
+M30 = timedelta(minutes=30)
+D = [timedelta(days=i) for i in range(6)]
 
-@pytest.fixture
-def app():
-    app = create_app()
-    app.config['TESTING'] = True
-    with app.app_context():
-        init_db()
-    yield app
 
+# Один пользователь на все сценарии: благодаря откату после каждого теста брони не копятся
+@pytest.fixture(scope="module")
+def booker_auth(seeded_users, basic_auth_headers):
+    return basic_auth_headers('booker', seeded_users['booker'].password)
 
-@pytest.fixture
-def client(app):
-    return app.test_client()
 
+# Фиксированная точка отсчёта: тесты не зависят от текущего времени и не падают около полуночи
+@pytest.fixture(scope="session")
+def base_time():
+    return datetime(2030, 1, 1, 12, 0, 0)
 
-def get_auth_header(username, password):
-    credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
-    return {'Authorization': f'Basic {credentials}'}
 
+# id первого места: GET /api/places один раз на модуль вместо запроса в каждом сценарии
+@pytest.fixture(scope="module")
+def first_place_id(client):
+    return client.get('/api/places').json[0]['id']
 
-def register_and_auth(client, username, email, password, basic_auth_headers):
-    client.post('/api/register', json={
-        'username': username, 'email': email, 'password': password
-    })
-    return basic_auth_headers(username, password)
 
-
-def test_create_and_list_booking(client, basic_auth_headers):
-    auth = register_and_auth(client, 'booker', 'booker@example.com', 'pass', basic_auth_headers)
-    # Получить id места
-    places = client.get('/api/places').get_json()
-    place_id = places[0]['id']
-    start = (datetime.now() + timedelta(days=1)).replace(microsecond=0, second=0)
-    end = start + timedelta(hours=2)
-    resp = client.post('/api/bookings', json={
+def _book(client, auth, place_id, start, end):
+    return client.post('/api/bookings', json={
         'place_id': place_id,
         'start_time': start.isoformat(),
         'end_time': end.isoformat()
     }, headers=auth)
+
+
+def _create_and_list(client, auth, place_id, start, end):
+    resp = _book(client, auth, place_id, start, end)
     assert resp.status_code == 201
     # Бронирование появилось в списке
     resp = client.get('/api/bookings', headers=auth)
     assert resp.status_code == 200
-    data = resp.get_json()
+    data = resp.json
     assert any(b['place_id'] == place_id for b in data)
 
 
-def test_booking_conflict(client, basic_auth_headers):
-    auth = register_and_auth(client, 'booker2', 'booker2@example.com', 'pass', basic_auth_headers)
-    places = client.get('/api/places').get_json()
-    place_id = places[0]['id']
-    start = (datetime.now() + timedelta(days=2)).replace(microsecond=0, second=0)
-    end = start + timedelta(hours=2)
+def _conflict(client, auth, place_id, start, end):
     # Первое бронирование
-    client.post('/api/bookings', json={
-        'place_id': place_id,
-        'start_time': start.isoformat(),
-        'end_time': end.isoformat()
-    }, headers=auth)
+    _book(client, auth, place_id, start, end)
     # Совпадающее бронирование
-    resp = client.post('/api/bookings', json={
-        'place_id': place_id,
-        'start_time': (start + timedelta(minutes=30)).isoformat(),
-        'end_time': (end + timedelta(minutes=30)).isoformat()
-    }, headers=auth)
+    resp = _book(client, auth, place_id, start + M30, end + M30)
     assert resp.status_code == 409
 
 
-def test_cancel_booking(client, basic_auth_headers):
-    auth = register_and_auth(client, 'booker3', 'booker3@example.com', 'pass', basic_auth_headers)
-    places = client.get('/api/places').get_json()
-    place_id = places[0]['id']
-    start = (datetime.now() + timedelta(days=3)).replace(microsecond=0, second=0)
-    end = start + timedelta(hours=2)
-    resp = client.post('/api/bookings', json={
-        'place_id': place_id,
-        'start_time': start.isoformat(),
-        'end_time': end.isoformat()
-    }, headers=auth)
-    booking_id = resp.get_json()['id']
+def _cancel(client, auth, place_id, start, end):
+    booking_id = _book(client, auth, place_id, start, end).json['id']
     # Отмена
     resp = client.post(f'/api/bookings/{booking_id}/cancel', headers=auth)
     assert resp.status_code == 200
@@ -92,23 +66,111 @@ def test_cancel_booking(client, basic_auth_headers):
     assert resp.status_code == 400
 
 
-def test_move_booking(client, basic_auth_headers):
-    auth = register_and_auth(client, 'booker4', 'booker4@example.com', 'pass', basic_auth_headers)
-    places = client.get('/api/places').get_json()
-    place_id = places[0]['id']
-    start = (datetime.now() + timedelta(days=4)).replace(microsecond=0, second=0)
-    end = start + timedelta(hours=2)
-    resp = client.post('/api/bookings', json={
-        'place_id': place_id,
-        'start_time': start.isoformat(),
-        'end_time': end.isoformat()
-    }, headers=auth)
-    booking_id = resp.get_json()['id']
+def _move(client, auth, place_id, start, end):
+    booking_id = _book(client, auth, place_id, start, end).json['id']
     # Перенос на другое время
-    new_start = start + timedelta(hours=3)
-    new_end = end + timedelta(hours=3)
     resp = client.post(f'/api/bookings/{booking_id}/move', json={
-        'start_time': new_start.isoformat(),
-        'end_time': new_end.isoformat()
+        'start_time': (start + H3).isoformat(),
+        'end_time': (end + H3).isoformat()
     }, headers=auth)
     assert resp.status_code == 200
+
+
+SCENARIOS = {
+    'create': _create_and_list,
+    'conflict': _conflict,
+    'cancel': _cancel,
+    'move': _move,
+}
+
+# Самые тяжёлые сценарии (несколько бронирований на тест) - не для быстрого прогона
+SLOW_SCENARIOS = {'conflict', 'move'}
+
+
+@pytest.mark.parametrize("scenario", [
+    pytest.param(name, marks=pytest.mark.slow) if name in SLOW_SCENARIOS else name
+    for name in SCENARIOS
+])
+def test_booking(client, booker_auth, first_place_id, base_time, scenario):
+    # У каждого сценария свой день, чтобы брони не пересекались
+    day = list(SCENARIOS).index(scenario) + 1
+    start = base_time + D[day]
+    end = start + H2
+    SCENARIOS[scenario](client, booker_auth, first_place_id, start, end)
+
+
+# Другой запрос меняет бронь между чтением версии и UPDATE: перенос получает 409, а не последнюю запись
+def test_concurrent_move_conflict(client, booker_auth, first_place_id, base_time, mocker):
+    start = base_time + D[5]
+    booking_id = _book(client, booker_auth, first_place_id, start, start + H2).json['id']
+    select_own_booking = booking_funcs._select_own_booking
+
+    def select_then_change(db, booking_id):
+        booking = select_own_booking(db, booking_id)
+        db.execute(update(Booking).where(Booking.id == booking_id).values(version=Booking.version + 1))
+        return booking
+
+    mocker.patch.object(booking_funcs, '_select_own_booking', select_then_change)
+    resp = client.post(f'/api/bookings/{booking_id}/move', json={
+        'start_time': (start + H3).isoformat(),
+        'end_time': (start + H3 + H2).isoformat()
+    }, headers=booker_auth)
+    assert resp.status_code == 409
+
+
+
+# Отмена - один условный UPDATE без чтения версии: изменение брони другим запросом
+# ей не мешает, а уже отменённую бронь повторно отменить нельзя
+def test_cancel_after_concurrent_change(client, booker_auth, first_place_id, base_time, mocker):
+    start = base_time + D[5]
+    booking_id = _book(client, booker_auth, first_place_id, start, start + H2).json['id']
+    select_own_booking = mocker.spy(booking_funcs, '_select_own_booking')
+    with session_scope() as db:
+        db.execute(update(Booking).where(Booking.id == booking_id).values(version=Booking.version + 1))
+        db.commit()
+
+    assert client.post(f'/api/bookings/{booking_id}/cancel', headers=booker_auth).status_code == 200
+    assert client.post(f'/api/bookings/{booking_id}/cancel', headers=booker_auth).status_code == 400
+    assert select_own_booking.call_count == 0
+    with session_scope() as db:
+        assert db.get(Booking, booking_id).version == 3
+
+# Порядок проверок переноса: 404 и статус 400 раньше формата дат и пересечения (409)
+def test_move_checks_order(client, booker_auth, first_place_id, base_time):
+    start = base_time + D[5]
+    taken_id = _book(client, booker_auth, first_place_id, start, start + H2).json['id']
+    cancelled_id = _book(client, booker_auth, first_place_id, start + H3, start + H3 + H2).json['id']
+    client.post(f'/api/bookings/{cancelled_id}/cancel', headers=booker_auth)
+    overlapping = {'start_time': start.isoformat(), 'end_time': (start + H2).isoformat()}
+
+    resp = client.post('/api/bookings/999999/move', json={'start_time': 'x'}, headers=booker_auth)
+    assert resp.status_code == 404
+    resp = client.post(f'/api/bookings/{cancelled_id}/move', json=overlapping, headers=booker_auth)
+    assert resp.status_code == 400
+    resp = client.post(f'/api/bookings/{taken_id}/move', json={'start_time': 'x'}, headers=booker_auth)
+    assert resp.status_code == 400
+
+
+# Создание и список отдают время в одном формате: UTC с явным смещением
+def test_booking_times_serialized_in_utc(client, booker_auth, first_place_id):
+    resp = _book(client, booker_auth, first_place_id,
+                 datetime.fromisoformat('2030-02-01T15:00:00+03:00'),
+                 datetime.fromisoformat('2030-02-01T17:00:00+03:00'))
+    assert resp.status_code == 201
+    assert resp.json['start_time'] == '2030-02-01T12:00:00+00:00'
+    listed = next(b for b in client.get('/api/bookings', headers=booker_auth).json if b['id'] == resp.json['id'])
+    assert (listed['start_time'], listed['end_time']) == (resp.json['start_time'], resp.json['end_time'])
+
+
+# На PostgreSQL без ограничения EXCLUDE (старая база) проверка пересечений запросом остаётся;
+# найденное ограничение запоминается, и база больше не опрашивается
+def test_overlap_precheck_until_constraint_found(mocker):
+    db = mocker.Mock()
+    db.get_bind.return_value.dialect.name = 'postgresql'
+    mocker.patch.object(booking_funcs, '_overlap_constraint_confirmed', False)
+    constraint_exists = mocker.patch.object(booking_funcs, 'overlap_constraint_exists', return_value=False)
+    assert booking_funcs._needs_overlap_check(db)
+    constraint_exists.return_value = True
+    assert not booking_funcs._needs_overlap_check(db)
+    assert not booking_funcs._needs_overlap_check(db)
+    assert constraint_exists.call_count == 2
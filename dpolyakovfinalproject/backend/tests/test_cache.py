@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+import src.auth
+from src.app.place_funcs import PLACES_CACHE_KEY
+
+
+def test_places_cache_hit_and_invalidation(client, fake_redis, basic_auth_headers, seeded_users):
+    resp = client.get('/api/places')
+    assert resp.status_code == 200
+    assert PLACES_CACHE_KEY in fake_redis.data
+    # Повторный запрос отдаётся из кэша, база не читается
+    fake_redis.data[PLACES_CACHE_KEY] = b'[]'
+    assert client.get('/api/places').json == []
+    # Создание места сбрасывает кэш
+    resp = client.post('/api/places', json={'name': 'Cached Place'},
+                       headers=basic_auth_headers('user1', 'pass1'))
+    assert resp.status_code == 201
+    assert PLACES_CACHE_KEY not in fake_redis.data
+    assert any(p['name'] == 'Cached Place' for p in client.get('/api/places').json)
+
+
+def test_basic_auth_cache_hit(client, fake_redis, basic_auth_headers, seeded_users, mocker):
+    verify = mocker.spy(src.auth, 'verify_password')
+    headers = basic_auth_headers('user5', 'pass5')
+    assert client.get('/api/users/me', headers=headers).status_code == 200
+    assert client.get('/api/users/me', headers=headers).status_code == 200
+    # Пароль проверяется только при первом запросе, дальше id берётся из кэша
+    assert verify.call_count == 1
+
+
+def test_users_me_served_from_user_cache(client, fake_redis, basic_auth_headers, seeded_users):
+    headers = basic_auth_headers('user5', 'pass5')
+    client.get('/api/users/me', headers=headers)
+    user_key = f"user:{seeded_users['user5'].id}"
+    assert user_key in fake_redis.data
+    fake_redis.data[user_key] = fake_redis.data[user_key].replace(b'user5@example.com', b'cached@example.com')
+    assert client.get('/api/users/me', headers=headers).json['email'] == 'cached@example.com'
+
+
+def test_deleted_user_cache_invalidated(client, fake_redis, basic_auth_headers, admin_headers, seeded_users):
+    headers = basic_auth_headers('user6', 'pass6')
+    user_id = seeded_users['user6'].id
+    assert client.get('/api/users/me', headers=headers).status_code == 200
+    resp = client.delete(f'/api/admin/users/{user_id}', headers=admin_headers)
+    assert resp.status_code == 200
+    assert f'user:{user_id}' not in fake_redis.data
+    # Закэшированный заголовок Basic Auth больше не пускает удалённого пользователя
+    assert client.get('/api/users/me', headers=headers).status_code == 401
+
+
+def _slot():
+    start = datetime(2031, 1, 1, 12, 0, tzinfo=timezone.utc)
+    return start, start + timedelta(hours=2)
+
+
+def _lock_key(place_id, start, end):
+    return f'lock:place:{place_id}:{start.isoformat()}:{end.isoformat()}'
+
+
+def test_booking_lock_contention(client, fake_redis, basic_auth_headers, seeded_users):
+    start, end = _slot()
+    # Слот держит другой, ещё не завершившийся запрос
+    fake_redis.data[_lock_key(1, start, end)] = b'1'
+    resp = client.post('/api/bookings', json={
+        'place_id': 1, 'start_time': start.isoformat(), 'end_time': end.isoformat()
+    }, headers=basic_auth_headers('booker', 'pass'))
+    assert resp.status_code == 409
+
+
+def test_booking_lock_released_after_commit(client, fake_redis, basic_auth_headers, seeded_users):
+    start, end = _slot()
+    headers = basic_auth_headers('booker', 'pass')
+    body = {'place_id': 1, 'start_time': start.isoformat(), 'end_time': end.isoformat()}
+    resp = client.post('/api/bookings', json=body, headers=headers)
+    assert resp.status_code == 201
+    assert _lock_key(1, start, end) not in fake_redis.data
+    # Отмена и повторная бронь того же слота сразу, не дожидаясь TTL блокировки
+    client.post(f"/api/bookings/{resp.json['id']}/cancel", headers=headers)
+    assert client.post('/api/bookings', json=body, headers=headers).status_code == 201
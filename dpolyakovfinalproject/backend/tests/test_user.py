@@ -5,7 +5,7 @@ def test_register_user_success(client):
         'password': 'testpass123'
     })
     assert resp.status_code == 201
-    data = resp.get_json()
+    data = resp.json
     assert 'user_id' in data
     assert data['message'] == 'User registered successfully'
 
@@ -15,7 +15,7 @@ def test_register_user_missing_fields(client):
         'username': 'testuser2'
     })
     assert resp.status_code == 400
-    data = resp.get_json()
+    data = resp.json
     assert 'error' in data
 
 
@@ -33,7 +33,7 @@ def test_register_user_conflict(client):
         'password': 'testpass123'
     })
     assert resp.status_code == 409
-    data = resp.get_json()
+    data = resp.json
     assert 'error' in data
 
 
@@ -48,7 +48,41 @@ def test_get_current_user_info(client, basic_auth_headers):
     headers = basic_auth_headers('testuser4', 'testpass123')
     resp = client.get('/api/users/me', headers=headers)
     assert resp.status_code == 200
-    data = resp.get_json()
+    data = resp.json
     assert data['username'] == 'testuser4'
     assert data['email'] == 'testuser4@example.com'
     assert data['is_admin'] is False
+
+
+def test_login_returns_bearer_token(client, basic_auth_headers):
+    client.post('/api/register', json={
+        'username': 'testuser5',
+        'email': 'testuser5@example.com',
+        'password': 'testpass123'
+    })
+    resp = client.post('/api/login', headers=basic_auth_headers('testuser5', 'testpass123'))
+    assert resp.status_code == 200
+    token = resp.json['token']
+    # Дальше достаточно токена, без логина и пароля
+    resp = client.get('/api/users/me', headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 200
+    assert resp.json['username'] == 'testuser5'
+    resp = client.get('/api/users/me', headers={'Authorization': f'Bearer {token}x'})
+    assert resp.status_code == 401
+
+
+def test_login_rejects_bearer_token(client, basic_auth_headers):
+    client.post('/api/register', json={
+        'username': 'testuser6',
+        'email': 'testuser6@example.com',
+        'password': 'testpass123'
+    })
+    token = client.post('/api/login', headers=basic_auth_headers('testuser6', 'testpass123')).json['token']
+    # Новый токен выдаётся только по паролю, иначе токен продлевался бы бесконечно
+    resp = client.post('/api/login', headers={'Authorization': f'Bearer {token}'})
+    assert resp.status_code == 401
+
+
+def test_bearer_without_token(client):
+    resp = client.get('/api/users/me', headers={'Authorization': 'Bearer '})
+    assert resp.status_code == 401
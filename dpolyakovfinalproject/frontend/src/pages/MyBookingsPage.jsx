@@ -106,9 +106,9 @@ function MyBookingsPage() {
       setMoveError('Время окончания должно быть позже времени начала');
       return;
     }
-    // Формируем новые start_time и end_time
-    const newStart = moveStart + 'T' + moveStartTime;
-    const newEnd = moveStart + 'T' + moveEndTime;
+    // Формируем новые start_time и end_time: местное время формы переводим в UTC со смещением
+    const newStart = new Date(moveStart + 'T' + moveStartTime).toISOString();
+    const newEnd = new Date(moveStart + 'T' + moveEndTime).toISOString();
     try {
       const res = await fetch(`/api/bookings/${moveId}/move`, {
         method: 'POST',
@@ -64,8 +64,9 @@ function PlacesListPage() {
             setBookingError('Укажите дату, время начала и окончания бронирования');
             return;
         }
-        const start_time = bookingDate + 'T' + bookingStartTime;
-        const end_time = bookingDate + 'T' + bookingEndTime;
+        // Время из формы - местное; на сервер уходит UTC с явным смещением
+        const start_time = new Date(bookingDate + 'T' + bookingStartTime).toISOString();
+        const end_time = new Date(bookingDate + 'T' + bookingEndTime).toISOString();
         try {
             const response = await fetch('/api/bookings', {
                 method: 'POST',